@@ -1,34 +1,83 @@
 import streamlit as st
+import os
 import time
-from scraper import ArticleDownloader
-import streamlit_authenticator as stauth
+from pathlib import Path
 import yaml
 from yaml.loader import SafeLoader
 import hashlib
+import functools
 from logging_config import setup_logger, setup_file_logger
 
 # Set up logging - both console and file
 logger = setup_logger(__name__)
 file_logger = setup_file_logger(__name__, "logs/article_extractor.log")
 
+AUTH_CONFIG_PATH = ".streamlit/config.yaml"
 
+
+@functools.lru_cache(maxsize=256)
 def get_user_hash(username: str) -> str:
     """
-    Generate a SHA-256 hash for the given username.
+    Generate a BLAKE2b (160-bit) hash for the given username.
     
     This function is used to create a unique hash of the username, so 
     each user can have a unique folder for their extracted articles.
 
     This is easier solution than using the UUID library, because 
     uuid would require regular deletion of old folder.
+
+    The hash is only used as a stable folder name, BLAKE2b is chosen for
+    its speed. The username is stable for the whole session, so the result
+    is memoized and the hash is computed once per user.
+    """
+    return hashlib.blake2b(username.encode(), digest_size=20).hexdigest()
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def load_docx(path: str, mtime: float) -> bytes:
+    """
+    Read the generated DOCX file and cache its bytes.
+
+    Streamlit reruns the whole script on every widget interaction, so
+    reading the file inline would hit the disk on each rerun. The
+    modification time is part of the cache key, so a regenerated file
+    at the same path is read again. The number of cached files is
+    bounded, so bytes of outdated documents don't pile up in memory.
+
+    Args:
+        path (str): Path to the DOCX file.
+        mtime (float): Modification time of the file, used as cache key.
+    Returns:
+        bytes: The content of the DOCX file.
+    """
+    return Path(path).read_bytes()
+
+def build_metadata_markdown(result: dict) -> str:
+    """
+    Build the markdown of the article details panel.
+
+    The result doesn't change once stored, so the markdown is built once
+    when the extraction completes and rendered with a single element on
+    every rerun.
+
+    Args:
+        result (dict): The extracted article data, including 'block_counts'.
+    Returns:
+        str: Markdown with the title, author, date and content block counts.
     """
-    return hashlib.sha256(username.encode()).hexdigest()
+    # Block counts are computed by the downloader during the extraction
+    block_counts = result["block_counts"]
+    return "\n\n".join([
+        f"**Title:** {result['title']}",
+        f"**Author:** {result['author'] if result['author'] else 'Unknown'}",
+        f"**Date:** {result['date'] if result['date'] else 'Unknown'}",
+        f"**Content:** {block_counts.get('text', 0)} text blocks, {block_counts.get('image', 0)} images",
+    ])
 
 def get_article_downloader():
     """
     Initialize and return an instance of ArticleDownloader.
     
-    This function is used to create a singleton instance 
+    This function returns the process-wide instance 
     of the ArticleDownloader class. This is to prevent
     the re-initialization of the downloader
     every time the Streamlit app reruns, which can be
@@ -38,27 +87,62 @@ def get_article_downloader():
         ArticleDownloader: An instance of the ArticleDownloader class.
     """
     if "article_downloader" not in st.session_state:
-        st.session_state.article_downloader = ArticleDownloader()
+        # Imported here so the scraping stack is only loaded once it is needed
+        from scraper import get_downloader
+        st.session_state.article_downloader = get_downloader()
     return st.session_state.article_downloader
 
+@st.cache_data(show_spinner=False)
+def load_auth_config(mtime: float) -> dict:
+    """
+    Parse the authentication config file and cache the result.
+
+    The file is parsed once per modification time instead of on every
+    rerun, using the libyaml based loader when it is available.
+    st.cache_data hands out a copy on each call, so the authenticator
+    can update the credentials without affecting other sessions.
+
+    Args:
+        mtime (float): Modification time of the config file, used as cache key.
+    Returns:
+        dict: The parsed authentication config.
+    """
+    with open(AUTH_CONFIG_PATH) as file:
+        return yaml.load(file, Loader=getattr(yaml, "CSafeLoader", SafeLoader))
+
+def get_authenticator():
+    """
+    Initialize and return the Authenticate object for the session.
+
+    The authenticator is stored in the session state, so the cookie
+    handling and credentials setup are done once per session instead
+    of on every rerun of the app.
+
+    Returns:
+        stauth.Authenticate: The authenticator of the current session.
+    """
+    if "authenticator" not in st.session_state:
+        # Imported here to keep it out of the app's cold start
+        import streamlit_authenticator as stauth
+        config = load_auth_config(os.path.getmtime(AUTH_CONFIG_PATH))
+
+        # If you want to create or update the passwords in the config file,
+        # you can uncomment the following lines:
+        # stauth.Hasher.hash_passwords(config['credentials'])
+        # # write the hashed passwords back to the config
+        # with open(".streamlit/config.yaml", "w") as file:
+        #     yaml.dump(config, file, default_flow_style=False)
+
+        st.session_state.authenticator = stauth.Authenticate(
+            config['credentials'],
+            config['cookie']['name'],
+            config['cookie']['key'],
+            config['cookie']['expiry_days']
+        )
+    return st.session_state.authenticator
+
 def authenticate_user():
-    with open(".streamlit/config.yaml") as file:
-        config = yaml.load(file, Loader=SafeLoader)
-
-    # If you want to create or update the passwords in the config file,
-    # you can uncomment the following lines:
-    # stauth.Hasher.hash_passwords(config['credentials'])
-    # # write the hashed passwords back to the config
-    # with open(".streamlit/config.yaml", "w") as file:
-    #     yaml.dump(config, file, default_flow_style=False)
-
-    authenticator = stauth.Authenticate(
-        config['credentials'],
-        config['cookie']['name'],
-        config['cookie']['key'],
-        config['cookie']['expiry_days']
-    )
-        
+    authenticator = get_authenticator()
     
     authenticator.login(location = 'sidebar')
     
@@ -103,8 +187,6 @@ def main():
     set_layout()
     # Authenticate the user
     authenticator = authenticate_user()
-    # Initialize the ArticleDownloader singleton instance
-    article_downloader = get_article_downloader()
 
 
     # App introduction
@@ -120,6 +202,8 @@ def main():
         st.session_state.result = None
     if "path" not in st.session_state: # Store the path to the generated DOCX file
         st.session_state.path = None
+    if "metadata_md" not in st.session_state: # Store the rendered article details of the result
+        st.session_state.metadata_md = None
 
     # Define callback functions for buttons
     def start_extraction():
@@ -128,16 +212,17 @@ def main():
             st.session_state.result = None
         if "path" in st.session_state:
             st.session_state.path = None
+        if "metadata_md" in st.session_state:
+            st.session_state.metadata_md = None
         # Set extraction flag
         st.session_state.extracting = True
     
 
     def clear_results(): # Clear the results and reset the state
-        # Clear all session state
-        for key in list(st.session_state.keys()):
-
-            if key in ["extracting", "result", "path", "url_input"]:
-                del st.session_state[key]
+        # Clear the extraction state, the rest of the session state (login,
+        # authenticator, downloader) has to survive
+        for key in ("extracting", "result", "path", "metadata_md", "url_input"):
+            st.session_state.pop(key, None)
         st.session_state.extracting = False
         st.session_state["url_input"] = ""  # Clear the input text
 
@@ -157,14 +242,24 @@ def main():
     # Create a container for the progress bar and status updates
     progress_container = st.container()
     
+    # Time and message of the last progress redraw, shared across update_progress calls
+    last_redraw = {"time": 0.0, "message": None}
+
     # Function to update progress
     def update_progress(message, percent, progress_bar_obj, status_ph):
+        # Throttle repeated updates of the same stage to one redraw every 100 ms
+        # instead of sleeping on each update. A new message (stage) and the
+        # final (100%) update are always rendered, so the status is never stale
+        now = time.monotonic()
+        if (percent < 100 and message == last_redraw["message"]
+                and now - last_redraw["time"] < 0.1):
+            return True
+        last_redraw["time"] = now
+        last_redraw["message"] = message
         # Update the progress bar
         progress_bar_obj.progress(int(percent))
         # Update the status message
         status_ph.markdown(f"**Status:** {message}")
-        # Force a redraw
-        time.sleep(0.1)
         # Always continue processing
         return True
     
@@ -173,6 +268,7 @@ def main():
     if st.session_state.get("result") and st.session_state.get("path"):
         user_hash = get_user_hash(st.session_state.get("username"))
         expected_dir = f"temp/{user_hash}"
+        path = st.session_state.path
         # Ensure the expected dir and session_state.path match
         if path.startswith(expected_dir):
             st.session_state.path = path #starts with means 
@@ -187,14 +283,8 @@ def main():
         st.success("✅ Article extracted successfully!")
         
         with st.expander("Article Details", expanded=True):
-            st.markdown(f"**Title:** {result['title']}")
-            st.markdown(f"**Author:** {result['author'] if result['author'] else 'Unknown'}")
-            st.markdown(f"**Date:** {result['date'] if result['date'] else 'Unknown'}")
-            
-            # Count content blocks
-            text_blocks = sum(1 for block in result["content_blocks"] if block["type"] == "text")
-            image_blocks = sum(1 for block in result["content_blocks"] if block["type"] == "image")
-            st.markdown(f"**Content:** {text_blocks} text blocks, {image_blocks} images")
+            # The details are rendered once when the extraction completes
+            st.markdown(st.session_state.metadata_md)
         
         # Provide download button and clear button side by side
         st.markdown("### Actions")
@@ -202,7 +292,7 @@ def main():
         with col1:
             st.download_button(
                 label="Download DOCX",
-                data=open(path, "rb").read(),
+                data=load_docx(path, os.path.getmtime(path)),
                 file_name=f"extracted_article.docx",
                 mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
                 key="download_button",
@@ -217,32 +307,43 @@ def main():
             # Create placeholders for progress elements
             progress_bar = st.progress(0)
             status_placeholder = st.empty()
+            # Bind the progress elements once, the scraper calls this with (message, percent)
+            report_progress = functools.partial(update_progress, progress_bar_obj=progress_bar,
+                                                status_ph=status_placeholder)
             
-            update_progress("Starting article extraction...", 5, progress_bar, status_placeholder)
+            report_progress("Starting article extraction...", 5)
             
             try:
                 user_hash = get_user_hash(st.session_state.get("username"))
                 username = st.session_state.get("username", "unknown")
                 
                 # Log the start of extraction with user context
-                logger.info(f"User '{username}' (hash: {user_hash}) starting extraction for URL: {user_input}")
-                file_logger.info(f"User '{username}' (hash: {user_hash}) starting extraction for URL: {user_input}")
+                # %-style arguments, so the message is only formatted if INFO is enabled
+                start_msg = "User '%s' (hash: %s) starting extraction for URL: %s"
+                logger.info(start_msg, username, user_hash, user_input)
+                file_logger.info(start_msg, username, user_hash, user_input)
                 
-                # Run the extraction with progress updates using a lambda for the callback
+                # The downloader (and the scraping stack) is initialized on first use
+                article_downloader = get_article_downloader()
+                # Run the extraction with progress updates
                 _, result, path = article_downloader.run(unique_id=user_hash,
                     url = user_input, 
-                    progress_callback=lambda message, percent: update_progress(message, percent, progress_bar, status_placeholder)
+                    progress_callback=report_progress
                 )
                 
                 # Log successful extraction
-                logger.info(f"User '{username}' (hash: {user_hash}) successfully extracted article: {result.get('title', 'Unknown title')}")
-                file_logger.info(f"User '{username}' (hash: {user_hash}) successfully extracted article: {result.get('title', 'Unknown title')}")
+                success_msg = "User '%s' (hash: %s) successfully extracted article: %s"
+                title = result.get('title', 'Unknown title')
+                logger.info(success_msg, username, user_hash, title)
+                file_logger.info(success_msg, username, user_hash, title)
                 
                 # Complete the progress bar
-                update_progress("Article extracted successfully!", 100, progress_bar, status_placeholder)
+                report_progress("Article extracted successfully!", 100)
                 # Store results in session state
                 st.session_state.result = result
                 st.session_state.path = path
+                # Render the article details once, the result doesn't change between reruns
+                st.session_state.metadata_md = build_metadata_markdown(result)
                 # Reset extraction state
                 st.session_state.extracting = False
                 # Force a rerun to show results
@@ -252,12 +353,16 @@ def main():
                 user_hash = get_user_hash(st.session_state.get("username"))
                 username = st.session_state.get("username", "unknown")
                 
+                # Format the error once and reuse it for the logs and the UI
+                error_text = str(e)
+                
                 # Log the error with full user context
-                logger.error(f"User '{username}' (hash: {user_hash}) encountered error extracting URL '{user_input}': {str(e)}", exc_info=True)
-                file_logger.error(f"User '{username}' (hash: {user_hash}) encountered error extracting URL '{user_input}': {str(e)}", exc_info=True)
+                error_msg = f"User '{username}' (hash: {user_hash}) encountered error extracting URL '{user_input}': {error_text}"
+                logger.error(error_msg, exc_info=True)
+                file_logger.error(error_msg, exc_info=True)
                 
-                st.error(f"Error during extraction: {str(e)}")
-                update_progress(f"Error: {str(e)}", 100, progress_bar, status_placeholder)
+                st.error(f"Error during extraction: {error_text}")
+                report_progress(f"Error: {error_text}", 100)
                 # Button to clear the input/output (centered)
                 col1, col2 = st.columns([1, 2])
                 with col2:
@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+from contextlib import closing
+from typing import Optional
+from logging_config import setup_logger, setup_file_logger
+
+# Set up logging
+logger = setup_logger(__name__)
+file_logger = setup_file_logger(__name__, "logs/article_extractor.log")
+
+# Database used when no path is given, can be moved with the SCRAPE_CACHE_PATH environment variable
+DEFAULT_DB_PATH = "cache/scrape_cache.db"
+
+
+class ScrapeCache:
+    """
+    Persistent cache of scrape results stored in a SQLite database.
+
+    Scraping an article calls the LLM, which takes seconds and costs money,
+    so the results are cached by URL, prompt and model. Each operation opens
+    its own connection, which keeps the cache safe to use from the threads
+    of concurrent Streamlit sessions. A cache that can't be created or read
+    behaves as if it were empty, so it never breaks a scrape.
+    """
+
+    def __init__(self, db_path: str = None, ttl_days: float = 7):
+        """
+        Args:
+            db_path (str, optional): Path of the SQLite database file, defaults to
+                SCRAPE_CACHE_PATH or cache/scrape_cache.db.
+            ttl_days (float): Number of days after which a cached result expires.
+        """
+        if db_path is None:
+            db_path = os.getenv("SCRAPE_CACHE_PATH", DEFAULT_DB_PATH)
+        self.db_path = db_path
+        self.ttl_seconds = ttl_days * 24 * 60 * 60
+        self.enabled = True
+
+        try:
+            # Ensure the cache directory exists
+            db_dir = os.path.dirname(db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+        except (OSError, sqlite3.Error) as e:
+            warning_msg = f"Creating the scrape cache at {db_path} failed, caching is disabled: {e}"
+            logger.warning(warning_msg)
+            file_logger.warning(warning_msg)
+            self.enabled = False
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    @staticmethod
+    def make_key(url: str, prompt: str, model: str) -> str:
+        """
+        Build the cache key of a scrape.
+
+        Args:
+            url (str): The URL of the article.
+            prompt (str): The prompt sent to the LLM.
+            model (str): The name of the LLM.
+        Returns:
+            str: SHA-256 hex digest of the URL, prompt and model.
+        """
+        return hashlib.sha256((url + prompt + model).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Return the cached result for the key, None if missing or expired.
+
+        A failing cache is treated as a miss, so it never breaks a scrape.
+        """
+        if not self.enabled:
+            return None
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            warning_msg = f"Reading the scrape cache failed: {e}"
+            logger.warning(warning_msg)
+            file_logger.warning(warning_msg)
+            return None
+        if row is None:
+            return None
+        value, created_at = row
+        if time.time() - created_at > self.ttl_seconds:
+            return None
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError as e:
+            warning_msg = f"Decoding a cached result failed: {e}"
+            logger.warning(warning_msg)
+            file_logger.warning(warning_msg)
+            return None
+
+    def put(self, key: str, value: dict):
+        """
+        Store the result for the key, replacing any previous entry.
+
+        Expired entries are deleted at the same time, so the database doesn't
+        grow without bound.
+        """
+        if not self.enabled:
+            return
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM cache WHERE created_at < ?", (now - self.ttl_seconds,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), now),
+                )
+        except sqlite3.Error as e:
+            warning_msg = f"Writing to the scrape cache failed: {e}"
+            logger.warning(warning_msg)
+            file_logger.warning(warning_msg)
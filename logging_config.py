@@ -2,11 +2,23 @@
 import logging
 import sys
 import os
+import functools
+from logging.handlers import MemoryHandler, RotatingFileHandler
 
+# Buffered file handlers shared by all loggers writing to the same file
+_file_handlers = {}
+
+# Log level of the application loggers, e.g. LOG_LEVEL=WARNING in production
+# drops INFO records, and skips formatting INFO messages logged with %-style arguments
+LOG_LEVEL = logging.getLevelName(os.getenv("LOG_LEVEL", "INFO").upper())
+if not isinstance(LOG_LEVEL, int):
+    LOG_LEVEL = logging.INFO
+
+@functools.lru_cache(maxsize=None)
 def setup_logger(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
     if not logger.hasHandlers():
-        logger.setLevel(logging.INFO)
+        logger.setLevel(LOG_LEVEL)
 
         handler = logging.StreamHandler(sys.stdout)
         handler.setLevel(logging.INFO)
@@ -21,22 +33,42 @@ def setup_logger(name: str) -> logging.Logger:
         logger.propagate = False  # Avoid duplicate logs if root logger also logs
     return logger
 
+@functools.lru_cache(maxsize=None)
 def setup_file_logger(name: str, log_file: str = "logs/article_extractor.log") -> logging.Logger:
     """
     Set up a file logger for persistent logging to file.
     This is useful for tracking user issues over time.
+
+    Loggers are process wide singletons, so repeated calls with the
+    same arguments are served from a cache.
     """
     logger = logging.getLogger(f"{name}_file")
     if not logger.hasHandlers():
-        logger.setLevel(logging.INFO)
+        logger.setLevel(LOG_LEVEL)
+
+        logger.addHandler(_get_file_handler(log_file))
+        logger.propagate = False
+    return logger
+
+def _get_file_handler(log_file: str) -> logging.Handler:
+    """
+    Return the buffered, rotating handler writing to the given log file.
 
+    Records are collected in a MemoryHandler and written in batches, or
+    right away for errors, instead of a write and flush per record. The
+    file is rotated so it doesn't grow unbounded on a long running server.
+    All loggers writing to the same file share one handler, otherwise they
+    would rotate the file from under each other.
+    """
+    key = os.path.abspath(log_file)
+    if key not in _file_handlers:
         # Ensure logs directory exists
         log_dir = os.path.dirname(log_file)
         if log_dir and not os.path.exists(log_dir):
             os.makedirs(log_dir, exist_ok=True)
 
-        # File handler
-        file_handler = logging.FileHandler(log_file)
+        # Rotating file handler
+        file_handler = RotatingFileHandler(log_file, maxBytes=5_000_000, backupCount=3)
         file_handler.setLevel(logging.INFO)
 
         # Enhanced formatter with more detail for file logs
@@ -45,6 +77,6 @@ def setup_file_logger(name: str, log_file: str = "logs/article_extractor.log") -
         )
         file_handler.setFormatter(formatter)
 
-        logger.addHandler(file_handler)
-        logger.propagate = False
-    return logger
\ No newline at end of file
+        # Buffer records and flush them in batches or as soon as an error is logged
+        _file_handlers[key] = MemoryHandler(capacity=256, flushLevel=logging.ERROR, target=file_handler)
+    return _file_handlers[key]
\ No newline at end of file
@@ -1,44 +1,32 @@
 import os
-from dotenv import load_dotenv
-from scrapegraphai.graphs import SmartScraperGraph
-from scrapegraphai.utils import prettify_exec_info
-from pydantic import BaseModel, Field
-from typing import List, Optional
-from utils import MSWord, Article, ContentBlock
-from scrapegraphai.utils import prettify_exec_info
+import asyncio
+import logging
+import hashlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from operator import itemgetter
+from utils import MSWord, Article, build_http_session, get_progress_callback, noop_progress
+from cache import ScrapeCache
 from logging_config import setup_logger, setup_file_logger
 
 # Set up logging
 logger = setup_logger(__name__)
 file_logger = setup_file_logger(__name__, "logs/article_extractor.log")
 
+# Default name of the generated DOCX file
+DEFAULT_DOCX_FILENAME = "article_with_border.docx"
+# Maximum number of scrapes run_many keeps in flight, to stay under the LLM rate limits
+MAX_CONCURRENT_RUNS = 20
+# Number of DOCX files run_many builds at once, in a pool separate from the scrapes
+MAX_CONCURRENT_DOCX = 4
 
-class ArticleDownloader:
-    _instance = None
-
-    # Singleton pattern to ensure only one instance of ArticleDownloader exists
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(ArticleDownloader, cls).__new__(cls)
-            cls._instance.__initialized = False
-        return cls._instance
-
-    def __init__(self):
-        # Ensure the class is only initialized once
-        if self.__initialized:
-            return
-        
-        load_dotenv()
-        self.api_key = os.getenv("OPENAI_APIKEY")
-        self.graph_config = {
-            "llm": {
-                "api_key": self.api_key,
-                "model": "openai/gpt-4o",
-                "temperature": 0.0,  # Set to 0 for deterministic output
-            },
-        }
+# Keys and values check_structure expects in the extracted article
+REQUIRED_KEYS = frozenset({'title', 'date', 'author', 'content_blocks'})
+IMAGE_KEYS = frozenset({'url', 'alt_text', 'caption'})
 
-        self.default_prompt = """
+# Prompt sent to the LLM to extract the article
+DEFAULT_PROMPT = """
             CRITICAL: Extract the COMPLETE article with ALL content. Do not summarize or omit any sections.
 
             Extract the following elements:
@@ -55,38 +43,95 @@ class ArticleDownloader:
             IMPORTANT: Verify you've captured the ENTIRE article from start to finish before submitting.
             """
 
-        self.__initialized = True
+# Progress reported by run() at each stage, as (message, percent). MSWord reports
+# its own progress between docx_started and docx_created (65% to 98%).
+RUN_PROGRESS = {
+    "start": ("Initializing article extraction...", 10),
+    "scraped": ("Article content extracted successfully", 40),
+    "validated": ("Article structure validated", 50),
+    "docx_started": ("Creating DOCX document...", 60),
+    "docx_created": ("DOCX document created successfully", 99),
+    "complete": ("Process complete!", 100),
+}
+
+
+def _report(progress_callback, stage: str):
+    """
+    Report the progress of the given run() stage.
+    """
+    progress_callback(*RUN_PROGRESS[stage])
+
 
-    def _get_callback(self, callback=None):
+@functools.lru_cache(maxsize=1)
+def _build_graph_config(api_key: str) -> dict:
+    """
+    Build the SmartScraperGraph configuration for the given API key.
+    """
+    return {
+        "llm": {
+            "api_key": api_key,
+            "model": "openai/gpt-4o",
+            "temperature": 0.0,  # Set to 0 for deterministic output
+        },
+    }
+
+
+class ArticleDownloader:
+    # The downloader never gets new attributes, so skip the per-instance __dict__
+    __slots__ = ('api_key', 'session', 'cache', 'graph_config')
+
+    def __init__(self, cache: ScrapeCache = None):
         """
-        Returns the provided callback or a no-op function if None is provided.
-        This simplifies progress reporting by eliminating repeated null checks.
-        
         Args:
-            callback (callable, optional): The callback function to use
-        Returns:
-            callable: Either the provided callback or a no-op function
+            cache (ScrapeCache, optional): Cache of the scrape results, defaults to
+                the database at SCRAPE_CACHE_PATH or cache/scrape_cache.db.
         """
-        if callback is None:
-            return lambda message, percent: None  # No-op function
-        return callback
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        self.api_key = os.getenv("OPENAI_APIKEY")
+        # Shared HTTP session, so image downloads reuse connections across extractions
+        self.session = build_http_session()
+        # Persistent cache of scrape results, so repeated URLs skip the LLM call
+        self.cache = cache if cache is not None else ScrapeCache()
+        self.graph_config = _build_graph_config(self.api_key)
 
     def scrape(self, url: str, user_context: str = None) -> dict:
         """
         Scrape the article from the given URL using SmartScraperGraph.
+
+        Results are cached by URL, prompt and model, so scraping the same
+        article again doesn't call the LLM until the cached entry expires.
+        New results are validated with check_structure before they are cached,
+        so only well-formed articles are cached and returned.
         Args:
             url (str): The URL of the article to scrape.
             user_context (str, optional): User context for logging purposes.
         Returns:
             dict: The extracted article data in a structured format defined 
             by the Article model.
+        Raises:
+            ValueError: If the extracted article doesn't have the expected structure.
         """
         context_info = f" for {user_context}" if user_context else ""
+
+        cache_key = ScrapeCache.make_key(url, DEFAULT_PROMPT, self.graph_config["llm"]["model"])
+        result = self.cache.get(cache_key)
+        if result is not None:
+            cache_msg = f"Using cached article{context_info} for URL: {url}"
+            logger.info(cache_msg)
+            file_logger.info(cache_msg)
+            return result
+
         logger.info(f"Starting article scraping{context_info} from URL: {url}")
         file_logger.info(f"Starting article scraping{context_info} from URL: {url}")
-        
+
+        # Imported here, as scrapegraphai pulls in langchain and the OpenAI SDK,
+        # which takes seconds and isn't needed until the first uncached scrape
+        from scrapegraphai.graphs import SmartScraperGraph
+
         smart_scraper_graph = SmartScraperGraph(
-            prompt = self.default_prompt,
+            prompt = DEFAULT_PROMPT,
             # also accepts a string with the already downloaded HTML code
             source=url,
             config=self.graph_config,
@@ -95,31 +140,46 @@ class ArticleDownloader:
 
         result = smart_scraper_graph.run()
         
-        graph_exec_info = smart_scraper_graph.get_execution_info()
-        total_price_usd = next((node['total_cost_USD'] for node in graph_exec_info if node['node_name'] == 'TOTAL RESULT'), None)
+        # The execution info is only used for the cost message, skip it if nobody logs it
+        if logger.isEnabledFor(logging.INFO) or file_logger.isEnabledFor(logging.INFO):
+            graph_exec_info = smart_scraper_graph.get_execution_info()
+            # Index the nodes by name once, so other fields can be looked up the same way
+            exec_info_by_node = {node['node_name']: node for node in graph_exec_info}
+            total_price_usd = exec_info_by_node.get('TOTAL RESULT', {}).get('total_cost_USD')
+
+            # %-style arguments, so the message is only formatted if INFO is enabled
+            logger.info('Total price of the run%s: %s USD', context_info, total_price_usd)
+            file_logger.info('Total price of the run%s: %s USD', context_info, total_price_usd)
 
-        cost_msg = f'Total price of the run{context_info}: {total_price_usd} USD'
-        logger.info(cost_msg)
-        file_logger.info(cost_msg)
+        # Only cache well-formed results, a failed extraction should be retried
+        try:
+            self.check_structure(result, user_context)
+        except ValueError as e:
+            error_msg = f"Invalid result structure{context_info}: {e}"
+            logger.error(error_msg)
+            file_logger.error(error_msg)
+            raise ValueError(f"Invalid result structure: {e}")
+        self.cache.put(cache_key, result)
         return result
     
 
-    def create_docx(self, result: Article, url, uuid, progress_callback=None, user_context=None):
+    def create_docx(self, result: dict, url, uuid, progress_callback=None, user_context=None,
+                    docx_filename: str = DEFAULT_DOCX_FILENAME):
         """
         Create a DOCX file with the extracted article content.
         
         Args:
-            result (Article): The extracted article data.
+            result (dict): The extracted article data, as validated by check_structure.
             url (str): The URL of the article, used for context.
             uuid (str): Unique identifier for the extraction run.
             progress_callback (callable, optional): Callback function to report progress.
             user_context (str, optional): User context for logging purposes.
+            docx_filename (str, optional): Name of the DOCX file to create.
         Returns:
             str: The filename of the created DOCX file where the article is saved.
         """
-        progress_callback = self._get_callback(progress_callback)
+        progress_callback = get_progress_callback(progress_callback)
         
-        docx_filename = "article_with_border.docx"
         MSWord.create_page_bordered_docx(
             uuid=uuid,
             filename=docx_filename,
@@ -128,7 +188,8 @@ class ArticleDownloader:
             border_color=(150, 42, 46),  # Brown color
             border_width=200,  # Border width in points
             progress_callback=progress_callback,
-            user_context=user_context
+            user_context=user_context,
+            session=self.session
             # header=f"Author: {result.author}" if result.author else None,
             # footer=f"Date: {result.date}" if result.date else None
         )
@@ -164,32 +225,31 @@ class ArticleDownloader:
         """
         context_info = f" for {user_context}" if user_context else ""
         
-        required_keys = {'title', 'date', 'author', 'content_blocks'}
         if not isinstance(result, dict):
             raise ValueError("Result must be a dictionary")
-        if not required_keys.issubset(result.keys()):
-            raise ValueError(f"Result must contain keys: {required_keys}")
+        if not REQUIRED_KEYS <= result.keys():
+            raise ValueError(f"Result must contain keys: {set(REQUIRED_KEYS)}")
         if not isinstance(result['content_blocks'], list):
             raise ValueError("content_blocks must be a list")
         for block in result['content_blocks']:
-            if not isinstance(block, dict):
+            # The blocks are parsed from JSON, so they are plain dicts
+            if type(block) is not dict:
                 raise ValueError("Each content block must be a dictionary")
-            if 'type' not in block or block['type'] not in {'text', 'image'}:
-                raise ValueError("Each content block must have a valid 'type' key")
-            if block['type'] == 'text' and 'content' not in block:
-                raise ValueError("Text blocks must have a 'content' key")
-            if block['type'] == 'image':
-                if 'url' not in block or 'alt_text' not in block or 'caption' not in block:
+            # Look the type up once and branch on it
+            block_type = block.get('type')
+            if block_type == 'text':
+                if 'content' not in block:
+                    raise ValueError("Text blocks must have a 'content' key")
+            elif block_type == 'image':
+                if not IMAGE_KEYS <= block.keys():
                     raise ValueError("Image blocks must have 'url' and 'alt_text' keys")
-                
+            else:
+                raise ValueError("Each content block must have a valid 'type' key")
 
         return True
-                
-
 
-        
-
-    def run(self, unique_id, url: str, progress_callback=None) -> tuple[str, str]:
+    def run(self, unique_id, url: str, progress_callback=None,
+            docx_filename: str = DEFAULT_DOCX_FILENAME) -> tuple[str, dict, str]:
         """
         Run the scraper and create a DOCX file with the extracted article.
         
@@ -198,39 +258,55 @@ class ArticleDownloader:
             url (str): The URL of the article to scrape.
             progress_callback (callable, optional): Callback function to report progress.
                 The function should accept a message string and a percentage float.
+            docx_filename (str, optional): Name of the DOCX file to create.
         Returns:
             str: The filename of the created DOCX file.
-            str: The extracted article data.
+            dict: The extracted article data, with the number of text and
+                image blocks under 'block_counts'.
             str: The absolute path to the created DOCX file.
         """
         # Each extraction run has a unique ID
-        progress_callback = self._get_callback(progress_callback)
+        progress_callback = get_progress_callback(progress_callback)
         user_context = f"user_hash:{unique_id}"
         
-        progress_callback("Initializing article extraction...", 10)
+        _report(progress_callback, "start")
         
         # Extract article content
-        result = self.scrape(url, user_context)
-        progress_callback("Article content extracted successfully", 40)
-        
         try:
-            self.check_structure(result, user_context)
-            progress_callback("Article structure validated", 50)
+            result = self.scrape(url, user_context)
         except ValueError as e:
-            error_msg = f"Invalid result structure for {user_context}: {e}"
-            logger.error(error_msg)
-            file_logger.error(error_msg)
             progress_callback(f"Error: {e}", 100)
-            raise ValueError(f"Invalid result structure: {e}")
+            raise
+        _report(progress_callback, "scraped")
+
+        return self._finish_run(unique_id, url, result, progress_callback, docx_filename)
+
+    def _finish_run(self, unique_id, url: str, result: dict, progress_callback,
+                    docx_filename: str) -> tuple[str, dict, str]:
+        """
+        Create the DOCX file of the scraped article.
+
+        This is the part of run() after the scrape, split out so run_many can
+        build one document while the next article is being scraped.
+        Takes the arguments of run() plus the result of scrape(), which is
+        already validated, and returns the same values.
+        """
+        user_context = f"user_hash:{unique_id}"
+
+        _report(progress_callback, "validated")
+        # Count the content blocks by type once, so callers don't have to rescan them
+        counts = Counter(map(itemgetter("type"), result["content_blocks"]))
+        result["block_counts"] = {"text": counts["text"], "image": counts["image"]}
         
         # Generate DOCX file
-        progress_callback("Creating DOCX document...", 60)
+        _report(progress_callback, "docx_started")
         
-        filename = self.create_docx(result, url, unique_id, progress_callback, user_context)
-        progress_callback("DOCX document created successfully", 90)
+        filename = self.create_docx(result, url, unique_id, progress_callback, user_context,
+                                    docx_filename)
+        _report(progress_callback, "docx_created")
         
         path = f"temp/{unique_id}/{filename}"
-        progress_callback("Process complete!", 100)
+        _report(progress_callback, "complete")
         
         success_msg = f"Successfully completed extraction for {user_context}, file saved to: {path}"
         logger.info(success_msg)
@@ -238,4 +314,57 @@ class ArticleDownloader:
         
         return filename, result, path
 
+    async def run_many(self, unique_id, urls: list[str],
+                       concurrency: int = MAX_CONCURRENT_RUNS) -> dict:
+        """
+        Extract several articles concurrently.
+
+        The extractions are bound by the network and the LLM, so running them
+        concurrently cuts the wall time of a batch close to the slowest article.
+        The scrapes run in a thread pool of their own, sized to the concurrency
+        limit, so the limit holds whatever the size of the default executor.
+        The DOCX files are built in a second, smaller pool, so an article's
+        DOCX is built while the next scrapes run instead of queueing behind
+        them. Each article is saved to its own DOCX file named after its URL,
+        and repeated URLs are extracted once.
+        Args:
+            unique_id (str): Unique identifier for the user/extraction run.
+            urls (list[str]): The URLs of the articles to extract.
+            concurrency (int, optional): Maximum number of scrapes in flight.
+        Returns:
+            dict: Maps each URL to the (filename, result, path) tuple returned by
+            run(), or to the exception raised while extracting it.
+        """
+        loop = asyncio.get_running_loop()
+        user_context = f"user_hash:{unique_id}"
+        # Repeated URLs would write the same DOCX file at the same time
+        urls = list(dict.fromkeys(urls))
+
+        async def run_one(url):
+            url_hash = hashlib.blake2b(url.encode(), digest_size=8).hexdigest()
+            result = await loop.run_in_executor(scrape_pool, self.scrape, url, user_context)
+            return await loop.run_in_executor(docx_pool, self._finish_run, unique_id, url, result,
+                                              noop_progress, f"article_{url_hash}.docx")
+
+        scrape_pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="scrape")
+        docx_pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DOCX, thread_name_prefix="docx")
+        try:
+            results = await asyncio.gather(*(run_one(url) for url in urls), return_exceptions=True)
+        finally:
+            # Don't wait for the threads on the event loop, if the batch is cancelled
+            # the queued extractions are dropped and the running ones finish on their own
+            scrape_pool.shutdown(wait=False, cancel_futures=True)
+            docx_pool.shutdown(wait=False, cancel_futures=True)
+        return dict(zip(urls, results))
+
+
+@functools.lru_cache(maxsize=1)
+def get_downloader() -> ArticleDownloader:
+    """
+    Return the process-wide ArticleDownloader.
 
+    The downloader holds the HTTP session and the scrape cache, so a single
+    instance is shared by every user of the app. The first call creates it,
+    later calls are a cache lookup.
+    """
+    return ArticleDownloader()
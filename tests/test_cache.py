@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import time
+import tempfile
+import sqlite3
+from contextlib import closing
+
+# Add the parent directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from unittest.mock import patch
+from cache import ScrapeCache
+
+class TestScrapeCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ScrapeCache(db_path=os.path.join(self.temp_dir.name, "cache.db"), ttl_days=7)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_make_key_depends_on_all_parts(self):
+        """Test make_key changes with the URL, prompt and model."""
+        key = ScrapeCache.make_key("https://example.com", "prompt", "model")
+        self.assertEqual(key, ScrapeCache.make_key("https://example.com", "prompt", "model"))
+        self.assertNotEqual(key, ScrapeCache.make_key("https://example.org", "prompt", "model"))
+        self.assertNotEqual(key, ScrapeCache.make_key("https://example.com", "other", "model"))
+        self.assertNotEqual(key, ScrapeCache.make_key("https://example.com", "prompt", "other"))
+
+    def test_get_missing_key(self):
+        """Test get returns None for a key that was never stored."""
+        self.assertIsNone(self.cache.get("missing"))
+
+    def test_put_and_get(self):
+        """Test a stored result is returned as an equal dictionary."""
+        value = {'title': 'Test Article', 'content_blocks': [{'type': 'text', 'content': 'Text'}]}
+        self.cache.put("key", value)
+        self.assertEqual(self.cache.get("key"), value)
+
+    def test_expired_entry(self):
+        """Test get returns None once the entry is older than the TTL."""
+        self.cache.put("key", {'title': 'Test Article'})
+        expired = time.time() + self.cache.ttl_seconds + 1
+        with patch('cache.time.time', return_value=expired):
+            self.assertIsNone(self.cache.get("key"))
+
+    def test_expired_entries_deleted_on_put(self):
+        """Test put deletes the entries older than the TTL."""
+        self.cache.put("old", {'title': 'Old Article'})
+        later = time.time() + self.cache.ttl_seconds + 1
+        with patch('cache.time.time', return_value=later):
+            self.cache.put("new", {'title': 'New Article'})
+        with closing(sqlite3.connect(self.cache.db_path)) as conn, conn:
+            keys = [row[0] for row in conn.execute("SELECT key FROM cache")]
+        self.assertEqual(keys, ["new"])
+
+    def test_corrupted_entry(self):
+        """Test get returns None for an entry that isn't valid JSON."""
+        with closing(sqlite3.connect(self.cache.db_path)) as conn, conn:
+            conn.execute("INSERT INTO cache (key, value, created_at) VALUES (?, ?, ?)",
+                         ("key", "{not json", time.time()))
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_unusable_path_disables_cache(self):
+        """Test a cache that can't be created is disabled instead of raising."""
+        # A file where the cache directory should be, so the database can't be created
+        blocker = os.path.join(self.temp_dir.name, "blocker")
+        open(blocker, "w").close()
+        cache = ScrapeCache(db_path=os.path.join(blocker, "cache", "cache.db"))
+
+        self.assertFalse(cache.enabled)
+        cache.put("key", {'title': 'Test Article'})
+        self.assertIsNone(cache.get("key"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,17 +1,37 @@
 import unittest
 import sys
 import os
+import asyncio
+import tempfile
+import time
 
 # Add the parent directory to the sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from unittest.mock import patch, MagicMock
-from scraper import ArticleDownloader
+from scraper import ArticleDownloader, DEFAULT_PROMPT
+from cache import ScrapeCache
+
+VALID_ARTICLE = {
+    'title': 'Test Article',
+    'date': '2025-06-18',
+    'author': 'Test Author',
+    'content_blocks': [{'type': 'text', 'content': 'This is a test paragraph.'}]
+}
 
 class TestArticleDownloader(unittest.TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
+        # The tests don't modify the downloader, so build it once for the class,
+        # with its cache in a temporary directory
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cache = ScrapeCache(db_path=os.path.join(cls.temp_dir.name, "cache.db"))
         with patch.dict('os.environ', {'SCRAPER_API_KEY': 'test_key'}):
-            self.downloader = ArticleDownloader()
+            cls.downloader = ArticleDownloader(cache=cache)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
     
     def test_check_structure_valid_input(self):
         """Test check_structure with a valid input structure."""
@@ -205,6 +225,105 @@ class TestArticleDownloader(unittest.TestCase):
         
         self.assertEqual(str(context.exception), "Image blocks must have 'url' and 'alt_text' keys")
 
+    def test_run_many_maps_urls_to_results(self):
+        """Test run_many returns each URL's result or exception with distinct DOCX files."""
+        urls = ['https://example.com/a', 'https://example.com/b']
+
+        def fake_scrape(url, user_context=None):
+            if url == urls[1]:
+                raise ValueError("Invalid result structure: Result must be a dictionary")
+            return dict(VALID_ARTICLE)
+
+        def fake_create_docx(result, url, uuid, progress_callback=None, user_context=None,
+                             docx_filename=None):
+            return docx_filename
+
+        with patch.object(ArticleDownloader, 'scrape', side_effect=fake_scrape), \
+             patch.object(ArticleDownloader, 'create_docx', side_effect=fake_create_docx) as create_docx:
+            results = asyncio.run(self.downloader.run_many('user', urls))
+
+        self.assertEqual(set(results), set(urls))
+        self.assertIsInstance(results[urls[1]], ValueError)
+        filename, result, path = results[urls[0]]
+        self.assertEqual(result['block_counts'], {'text': 1, 'image': 0})
+        self.assertEqual(path, f"temp/user/{filename}")
+        self.assertNotEqual(filename, "article_with_border.docx")
+        create_docx.assert_called_once()
+
+    def test_run_many_extracts_repeated_url_once(self):
+        """Test a URL given several times is scraped and saved once."""
+        url = 'https://example.com/a'
+
+        with patch.object(ArticleDownloader, 'scrape', return_value=dict(VALID_ARTICLE)) as scrape, \
+             patch.object(ArticleDownloader, 'create_docx', return_value='article.docx') as create_docx:
+            results = asyncio.run(self.downloader.run_many('user', [url, url]))
+
+        self.assertEqual(list(results), [url])
+        scrape.assert_called_once()
+        create_docx.assert_called_once()
+
+    def test_run_many_cancel_does_not_wait_for_scrapes(self):
+        """Test cancelling run_many returns without waiting for the running scrapes."""
+        def slow_scrape(url, user_context=None):
+            time.sleep(1)
+            return dict(VALID_ARTICLE)
+
+        async def run_with_timeout():
+            await asyncio.wait_for(self.downloader.run_many('user', ['https://example.com/slow']), 0.1)
+
+        with patch.object(ArticleDownloader, 'scrape', side_effect=slow_scrape), \
+             patch.object(ArticleDownloader, 'create_docx', return_value='article.docx'):
+            start = time.monotonic()
+            with self.assertRaises(asyncio.TimeoutError):
+                asyncio.run(run_with_timeout())
+            elapsed = time.monotonic() - start
+
+        self.assertLess(elapsed, 0.5)
+
+    def _scrape_with_graph(self, url, graph_result):
+        """Scrape the URL with SmartScraperGraph replaced by a mock returning graph_result."""
+        graph_class = MagicMock()
+        graph_class.return_value.run.return_value = graph_result
+        graph_class.return_value.get_execution_info.return_value = []
+        graphs_module = MagicMock(SmartScraperGraph=graph_class)
+        with patch.dict('sys.modules', {'scrapegraphai': MagicMock(graphs=graphs_module),
+                                        'scrapegraphai.graphs': graphs_module}):
+            result = self.downloader.scrape(url)
+        return result, graph_class
+
+    def _cache_key(self, url):
+        return ScrapeCache.make_key(url, DEFAULT_PROMPT, self.downloader.graph_config["llm"]["model"])
+
+    def test_scrape_cache_hit(self):
+        """Test a cached article is returned without calling SmartScraperGraph."""
+        url = 'https://example.com/cached'
+        self.downloader.cache.put(self._cache_key(url), VALID_ARTICLE)
+
+        result, graph_class = self._scrape_with_graph(url, None)
+
+        self.assertEqual(result, VALID_ARTICLE)
+        graph_class.assert_not_called()
+
+    def test_scrape_cache_miss_stores_result(self):
+        """Test a newly scraped valid article is cached."""
+        url = 'https://example.com/new'
+
+        result, graph_class = self._scrape_with_graph(url, dict(VALID_ARTICLE))
+
+        self.assertEqual(result, VALID_ARTICLE)
+        graph_class.assert_called_once()
+        self.assertEqual(self.downloader.cache.get(self._cache_key(url)), VALID_ARTICLE)
+
+    def test_scrape_invalid_result_not_cached(self):
+        """Test an invalid article raises ValueError and isn't cached."""
+        url = 'https://example.com/invalid'
+
+        with self.assertRaises(ValueError) as context:
+            self._scrape_with_graph(url, "No answer found.")
+
+        self.assertIn("Invalid result structure", str(context.exception))
+        self.assertIsNone(self.downloader.cache.get(self._cache_key(url)))
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,186 @@
+import unittest
+import sys
+import os
+import io
+import tempfile
+
+# Add the parent directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from unittest.mock import patch
+from docx import Document
+from docx.shared import Inches
+from PIL import Image
+from utils import MSWord, build_http_session
+
+class TestInlineFormatting(unittest.TestCase):
+    def _runs(self, text):
+        paragraph = Document().add_paragraph()
+        MSWord._add_inline_formatted_runs(paragraph, text)
+        return [(run.text, bool(run.bold), bool(run.italic)) for run in paragraph.runs]
+
+    def test_plain_text(self):
+        """Test text without formatting is added as a single plain run."""
+        self.assertEqual(self._runs("Plain text"), [("Plain text", False, False)])
+
+    def test_bold_and_italic_sections(self):
+        """Test bold and italic sections become separate runs."""
+        self.assertEqual(
+            self._runs("A **bold** and _italic_ and *starred* end"),
+            [
+                ("A ", False, False),
+                ("bold", True, False),
+                (" and ", False, False),
+                ("italic", False, True),
+                (" and ", False, False),
+                ("starred", False, True),
+                (" end", False, False),
+            ]
+        )
+
+    def test_unclosed_marker(self):
+        """Test an unclosed marker is kept as plain text."""
+        self.assertEqual(self._runs("2 ** 3 is eight"), [("2 ** 3 is eight", False, False)])
+
+class TestRenderTextBlock(unittest.TestCase):
+    def _render(self, text):
+        doc = Document()
+        MSWord._render_text_block(doc, {'type': 'text', 'content': text}, {}, {})
+        return doc
+
+    def test_plain_text_is_escaped(self):
+        """Test plain text keeps XML special characters and stays before the section properties."""
+        doc = self._render('Fish & <chips> "to go"')
+        self.assertEqual([p.text for p in doc.paragraphs], ['Fish & <chips> "to go"'])
+        self.assertTrue(doc.element.body[-1].tag.endswith('}sectPr'))
+
+    def test_line_breaks_use_the_docx_api(self):
+        """Test text with a line break is still added as a Word line break."""
+        doc = self._render('First line\nSecond line')
+        self.assertEqual(doc.paragraphs[0].text, 'First line\nSecond line')
+        self.assertEqual(len(doc.paragraphs[0].runs), 1)
+
+    def test_heading(self):
+        """Test a markdown heading becomes a Word heading."""
+        doc = self._render('## Subtitle')
+        self.assertEqual(doc.paragraphs[0].text, 'Subtitle')
+        self.assertEqual(doc.paragraphs[0].style.name, 'Heading 2')
+
+class TestAddPicture(unittest.TestCase):
+    def test_repeated_image_shares_one_part(self):
+        """Test the same image added twice is embedded once and shown twice."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            image_path = os.path.join(temp_dir, "image.png")
+            Image.new('RGB', (20, 10)).save(image_path)
+
+            doc = Document()
+            image_parts = {}
+            for _ in range(2):
+                MSWord._add_picture(doc.add_paragraph().add_run(), image_path, Inches(4), image_parts)
+
+        self.assertEqual(len(doc.inline_shapes), 2)
+        self.assertEqual(doc.inline_shapes[1].width, Inches(4))
+        self.assertEqual(doc.inline_shapes[1].height, Inches(2))
+        image_rels = [rel for rel in doc.part.rels.values() if rel.reltype.endswith('/image')]
+        self.assertEqual(len(image_rels), 1)
+
+class FakeResponse:
+    def __init__(self, data, headers):
+        self.raw = io.BytesIO(data)
+        self.headers = headers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+class FakeSession:
+    def __init__(self, data, headers):
+        self.data = data
+        self.headers = headers
+
+    def get(self, url, **kwargs):
+        return FakeResponse(self.data, self.headers)
+
+class TestBuildHttpSession(unittest.TestCase):
+    def test_retry_after_is_ignored(self):
+        """Test retries don't sleep for the Retry-After time sent by the server."""
+        retries = build_http_session().get_adapter('https://example.com').max_retries
+        self.assertEqual(retries.total, 2)
+        self.assertFalse(retries.respect_retry_after_header)
+
+class TestDownloadImage(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        image = io.BytesIO()
+        Image.new('RGB', (20, 10)).save(image, 'PNG')
+        self.data = image.getvalue()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _download(self, headers, max_image_bytes):
+        session = FakeSession(self.data, headers)
+        return MSWord._download_image('https://example.com/image.png', self.temp_dir.name, session,
+                                      True, max_image_bytes=max_image_bytes)
+
+    def test_image_within_limit(self):
+        """Test an RGB PNG within the size limit is kept as downloaded."""
+        path = self._download({'Content-Type': 'image/png'}, len(self.data))
+        self.assertTrue(path.endswith('.png'))
+        with open(path, 'rb') as image_file:
+            self.assertEqual(image_file.read(), self.data)
+
+    def test_content_length_over_limit(self):
+        """Test an image announced as too large is skipped."""
+        headers = {'Content-Type': 'image/png', 'Content-Length': str(len(self.data))}
+        self.assertIsNone(self._download(headers, len(self.data) - 1))
+
+    def test_body_over_limit(self):
+        """Test an image without Content-Length is skipped once it goes over the limit."""
+        self.assertIsNone(self._download({'Content-Type': 'image/png'}, len(self.data) - 1))
+
+class TestCreatePageBorderedDocx(unittest.TestCase):
+    def test_images_deleted_when_rendering_fails(self):
+        """Test the temporary image directory is removed even if building the document fails."""
+        image = io.BytesIO()
+        Image.new('RGB', (20, 10)).save(image, 'PNG')
+        session = FakeSession(image.getvalue(), {'Content-Type': 'image/png'})
+        content = {
+            'title': 'Test Article',
+            'date': '2025-06-18',
+            'author': 'Test Author',
+            'content_blocks': [
+                {'type': 'image', 'url': 'https://example.com/image.png', 'alt_text': 'Image', 'caption': ''},
+                # Control characters aren't allowed in XML, so python-docx rejects the text
+                {'type': 'text', 'content': 'Bad \x0b text'},
+            ]
+        }
+        created_dirs = []
+        mkdtemp = tempfile.mkdtemp
+
+        def recording_mkdtemp(*args, **kwargs):
+            created_dirs.append(mkdtemp(*args, **kwargs))
+            return created_dirs[-1]
+
+        # Run in a temporary directory, as the document directory is created under temp/
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as work_dir:
+            os.chdir(work_dir)
+            try:
+                with patch('utils.tempfile.mkdtemp', side_effect=recording_mkdtemp):
+                    with self.assertRaises(ValueError):
+                        MSWord.create_page_bordered_docx('user', 'article.docx', content,
+                                                         'https://example.com', session=session)
+            finally:
+                os.chdir(cwd)
+
+        self.assertEqual(len(created_dirs), 1)
+        self.assertFalse(os.path.exists(created_dirs[0]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,81 +1,357 @@
 import os
-import requests
-from docx import Document
-from docx.shared import Inches, Pt, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml import parse_xml, OxmlElement
-from docx.oxml.ns import nsdecls, qn
+import re
+import functools
+import hashlib
+import shutil
+import tempfile
 from urllib.parse import urlparse
+from xml.sax.saxutils import escape as xml_escape
 import mimetypes # mime types is used to determine the type of file being downloaded
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, List, Optional
 from pydantic import BaseModel, Field
-from PIL import Image
+# docx, PIL and requests are imported where they are used, so importing this
+# module for the Article model doesn't load them
+if TYPE_CHECKING:
+    import requests
 from logging_config import setup_logger, setup_file_logger
 
 # Initialize logger
 logger = setup_logger(__name__)
 file_logger = setup_file_logger(__name__, "logs/article_extractor.log")
 
+# Maximum number of images downloaded in parallel
+MAX_DOWNLOAD_WORKERS = 16
+# Seconds to wait for an image server to accept the connection and to send data
+DOWNLOAD_TIMEOUT = (5, 15)
+# Size of the chunks image downloads are streamed to disk in
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Images larger than this many bytes are not downloaded, a placeholder is shown instead
+MAX_IMAGE_BYTES = 10_000_000
+# Largest width or height, in pixels, of the embedded images: 4 inches at 300 dpi,
+# so downscaled images still print sharply
+MAX_IMAGE_SIZE = 1200
+# Image formats python-docx embeds as they are, with their file extension and the
+# modes Word displays correctly
+PASSTHROUGH_IMAGE_FORMATS = {
+    "JPEG": (".jpg", frozenset({"RGB", "L"})),
+    "PNG": (".png", frozenset({"RGB", "RGBA", "L", "LA", "P"})),
+    "GIF": (".gif", frozenset({"P", "L"})),
+}
 
+# WordprocessingML namespace, the "w:" prefix of the document XML
+W_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
 
-class MSWord:
+# XML of the page borders, filled in with the border size and color
+PAGE_BORDERS_TEMPLATE = (
+    f'<w:pgBorders xmlns:w="{W_NAMESPACE}" w:offsetFrom="page">'
+    + "".join(
+        f'<w:{side} w:val="single" w:sz="{{size}}" w:space="0" w:color="{{color}}"/>'
+        for side in ("top", "left", "bottom", "right")
+    )
+    + "</w:pgBorders>"
+)
 
-    @staticmethod
-    def _get_callback(callback=None):
-        """
-        Returns the provided callback or a no-op function if None is provided.
-        This simplifies progress reporting by eliminating repeated null checks.
-        
-        Args:
-            callback (callable, optional): The callback function to use
-        Returns:
-            callable: Either the provided callback or a no-op function
-        """
-        if callback is None:
-            return lambda message, percent: None  # No-op function
-        return callback
+# Qualified names of the section properties set on every document, resolved once
+QN_PGBORDERS = f"{{{W_NAMESPACE}}}pgBorders"
+QN_MARGIN_SIDES = tuple(f"{{{W_NAMESPACE}}}{side}" for side in ("top", "bottom", "left", "right"))
+
+# Inline markdown formatting: **bold**, _italic_ or *italic*
+INLINE_MARKDOWN = re.compile(r'\*\*(.+?)\*\*|_(.+?)_|\*(.+?)\*', re.DOTALL)
+# Characters that keep a text block off the plain paragraph fast path: markdown
+# emphasis markers, and control characters python-docx turns into breaks and tabs
+NOT_PLAIN_TEXT = re.compile(r'[*_\x00-\x1f]')
+# XML of a paragraph holding a single unformatted run of (escaped) text
+PLAIN_PARAGRAPH_TEMPLATE = f'<w:p xmlns:w="{W_NAMESPACE}"><w:r><w:t xml:space="preserve">{{text}}</w:t></w:r></w:p>'
+
+
+def build_http_session() -> "requests.Session":
+    """
+    Create an HTTP session for downloading the article images.
+
+    The connection pool holds a connection per download worker, so parallel
+    downloads from one host reuse their connections instead of opening new
+    ones. Transient server errors are retried with a short backoff. The
+    Retry-After header is ignored, as urllib3 would sleep for as long as the
+    server asks, beyond the retry count and the download timeout.
+
+    Returns:
+        requests.Session: The configured session
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    retries = Retry(total=2, backoff_factor=0.2, status_forcelist=(429, 500, 502, 503, 504),
+                    respect_retry_after_header=False)
+    adapter = HTTPAdapter(pool_connections=MAX_DOWNLOAD_WORKERS, pool_maxsize=MAX_DOWNLOAD_WORKERS,
+                          max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@functools.lru_cache(maxsize=1)
+def _default_http_session() -> "requests.Session":
+    """
+    Return the session shared by downloads that aren't given one, created on first use.
+    """
+    return build_http_session()
+
+
+def noop_progress(message, percent):
+    """
+    Progress callback used when the caller doesn't report progress.
+    """
+
+# Lets create_page_bordered_docx skip building progress messages nobody sees
+noop_progress.is_noop = True
+
+
+def get_progress_callback(callback=None):
+    """
+    Returns the provided callback or a no-op function if None is provided.
+    This simplifies progress reporting by eliminating repeated null checks.
+    
+    Args:
+        callback (callable, optional): The callback function to use
+    Returns:
+        callable: Either the provided callback or noop_progress
+    """
+    if callback is None:
+        return noop_progress
+    return callback
+
+
+class MSWord:
     
     @staticmethod
-    def _add_page_border(doc, border_color=(150, 42, 46), border_width=200):
+    def _apply_section_props(section, margin=None, border_color=(150, 42, 46), border_width=200,
+                             header=None, footer=None):
         """
-        Add a page border to the document.
+        Set the page margins, page border, header and footer of a section.
+
+        The section properties element is looked up once and the margins and
+        border are written to it directly.
         
         Args:
-            doc: Document object
+            section: Section object
+            margin (Length, optional): Top, bottom, left and right page margin,
+                1 inch if not provided
             border_color (tuple): RGB color tuple (default: brown)
             border_width (int): Border width in points
+            header (str, optional): Optional header text
+            footer (str, optional): Optional footer text
         """
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        from docx.oxml import parse_xml
+        from docx.shared import Inches, Length
+
+        sectPr = section._sectPr
+        
+        # Set page margins
+        pgMar = sectPr.get_or_add_pgMar()
+        margin_twips = str(Length(margin if margin is not None else Inches(1)).twips)
+        for qn_side in QN_MARGIN_SIDES:
+            pgMar.set(qn_side, margin_twips)
+        
         # Convert RGB to hex color
         r, g, b = border_color
         hex_color = f"{r:02x}{g:02x}{b:02x}"
         
-        # Add page borders to each section
-        for section in doc.sections:
-            sectPr = section._sectPr
-            
-            # Create page borders element
-            pgBorders = OxmlElement('w:pgBorders')
-            pgBorders.set(qn('w:offsetFrom'), 'page')
-            
-            # Add each border (top, right, bottom, left)
-            for border_type in ['top', 'left', 'bottom', 'right']:
-                border = OxmlElement(f'w:{border_type}')
-                border.set(qn('w:val'), 'single')
-                border.set(qn('w:sz'), str(border_width))
-                border.set(qn('w:space'), '0')
-                border.set(qn('w:color'), hex_color)
-                pgBorders.append(border)
-            
-            # Add the borders to the section properties
-            if sectPr.find(qn('w:pgBorders')) is not None:
-                sectPr.remove(sectPr.find(qn('w:pgBorders')))
-            sectPr.append(pgBorders)
+        # Create page borders element with each border (top, left, bottom, right)
+        pgBorders = parse_xml(PAGE_BORDERS_TEMPLATE.format(size=border_width, color=hex_color))
+        
+        # Add the borders to the section properties, after the margins as the schema orders them
+        existing_pgBorders = sectPr.find(QN_PGBORDERS)
+        if existing_pgBorders is not None:
+            sectPr.remove(existing_pgBorders)
+        pgMar.addnext(pgBorders)
+        
+        # Add header if provided
+        if header:
+            header_para = section.header.paragraphs[0]
+            header_para.text = header
+            header_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        
+        # Add footer if provided
+        if footer:
+            footer_para = section.footer.paragraphs[0]
+            footer_para.text = footer
+            footer_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
     
+    @staticmethod
+    def _add_picture(run, image_path: str, width, image_parts: dict):
+        """
+        Add the picture to the end of the run, like run.add_picture().
+
+        The image part is added to the document the first time an image is
+        seen. Later pictures of the same image reference that part instead of
+        reading and hashing the file again.
+
+        Args:
+            run: Run object to add the picture to
+            image_path (str): Path of the image file
+            width (Length): Width of the picture, the height keeps the aspect ratio
+            image_parts (dict): Maps image paths to their (rId, filename, cx, cy),
+                filled in as images are added
+        """
+        from docx.oxml.shape import CT_Inline
+
+        if image_path not in image_parts:
+            rId, image = run.part.get_or_add_image(image_path)
+            cx, cy = image.scaled_dimensions(width, None)
+            image_parts[image_path] = (rId, image.filename, cx, cy)
+        rId, filename, cx, cy = image_parts[image_path]
+        inline = CT_Inline.new_pic_inline(run.part.next_id, rId, filename, cx, cy)
+        run._r.add_drawing(inline)
+
+    @staticmethod
+    def _render_text_block(doc, block: dict, images: dict, image_parts: dict, context_info: str = ""):
+        """
+        Add a text block to the document, turning markdown-style headings, bold
+        and italics into Word formatting.
+        
+        Args:
+            doc: Document object
+            block (dict): Text content block
+            images (dict): Unused, the renderers share one signature
+            image_parts (dict): Unused, the renderers share one signature
+            context_info (str): Unused, the renderers share one signature
+        """
+        from docx.oxml import parse_xml
+        from docx.shared import Pt
+
+        text_content = block["content"]
+        if text_content:
+            # Check for markdown-style formatting indicators
+
+            # Count the leading #s of headings (lines starting with ## or #) in one pass
+            stripped_text = text_content.lstrip()
+            heading_text = stripped_text.lstrip('#')
+            heading_level = len(stripped_text) - len(heading_text)
+
+            # Most paragraphs are plain text, add them as XML directly, which is
+            # several times faster than going through add_paragraph and add_run
+            if not heading_level and NOT_PLAIN_TEXT.search(text_content) is None:
+                doc.element.body._insert_p(parse_xml(PLAIN_PARAGRAPH_TEMPLATE.format(text=xml_escape(text_content))))
+                return
+
+            # Create a new paragraph for the text
+            paragraph = doc.add_paragraph()
+
+            # Handle headings
+            if heading_level:
+                run = paragraph.add_run(heading_text.strip())
+                run.bold = True
+                if heading_level >= 2:
+                    run.font.size = Pt(14)
+                    paragraph.style = 'Heading 2'
+                else:
+                    run.font.size = Pt(15)
+                    paragraph.style = 'Heading 1'
+
+            # Handle entire paragraph in bold (**text**)
+            elif text_content.startswith('**') and text_content.endswith('**'):
+                run = paragraph.add_run(text_content.strip('**'))
+                run.bold = True
+
+            # Handle entire paragraph in italics (_text_)
+            elif (text_content.startswith('_') and text_content.endswith('_')) or \
+                 (text_content.startswith('*') and text_content.endswith('*')):
+                run = paragraph.add_run(text_content.strip('_*'))
+                run.italic = True
+
+            # Handle mixed formatting with ** for bold and _ or * for italic
+            else:
+                MSWord._add_inline_formatted_runs(paragraph, text_content)
+
+    @staticmethod
+    def _render_image_block(doc, block: dict, images: dict, image_parts: dict, context_info: str = ""):
+        """
+        Add an image block to the document with its caption, or a placeholder
+        if the image couldn't be downloaded or embedded.
+        
+        Args:
+            doc: Document object
+            block (dict): Image content block
+            images (dict): Maps image URLs to their downloaded file paths
+            image_parts (dict): Image parts already in the document, see _add_picture
+            context_info (str): User context suffix for log messages
+        """
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        from docx.shared import Inches
+
+        url = block["url"]
+        caption = block.get("caption", "")
+        # get image path from the downloaded images
+        image_path = images.get(url, None)
+
+        p = doc.add_paragraph()
+        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+        if image_path and os.path.exists(image_path):
+            try:
+                run = p.add_run()
+                MSWord._add_picture(run, image_path, Inches(4), image_parts) # the image width is hardcoded to 4 inches, todo: make it configurable in streamlit
+
+                # Add caption if available
+                caption = block.get('caption', '')
+                if caption:
+                    caption_para = doc.add_paragraph()
+                    caption_run = caption_para.add_run(caption)
+                    caption_run.italic = True
+                    caption_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+            except Exception as img_error:
+                # If adding the image fails, add a placeholder
+                error_msg = f"Error adding image to document{context_info}: {url} - {str(img_error)}"
+                logger.error(error_msg)
+                file_logger.error(error_msg)
+                run = p.add_run("[Image could not be displayed]")
+                run.italic = True
+
+                # Try to still add caption
+                if caption:
+                    p.add_run("\n" + caption)
+        else:
+            # Add a placeholder if image wasn't downloaded successfully
+            run = p.add_run("[Image unavailable]")
+            run.italic = True
+
+    @staticmethod
+    def _add_inline_formatted_runs(paragraph, text: str):
+        """
+        Add the text to the paragraph, with **bold** and _italic_ or *italic*
+        sections as bold and italic runs.
+
+        Args:
+            paragraph: Paragraph object to add the runs to
+            text (str): Text with markdown-style inline formatting
+        """
+        pos = 0
+        for match in INLINE_MARKDOWN.finditer(text):
+            # Add the plain text before the formatted section
+            if match.start() > pos:
+                paragraph.add_run(text[pos:match.start()])
+            bold_text, italic_text = match.group(1), match.group(2) or match.group(3)
+            if bold_text is not None:
+                run = paragraph.add_run(bold_text)
+                run.bold = True
+            else:
+                run = paragraph.add_run(italic_text)
+                run.italic = True
+            pos = match.end()
+
+        # No more formatting found, add the rest of the text
+        if pos < len(text):
+            paragraph.add_run(text[pos:])
 
     @staticmethod
     def create_page_bordered_docx(uuid, filename, content, url, border_color=(150, 42, 46), 
                                 border_width=200, header=None, footer=None, 
-                                progress_callback=None, user_context=None):
+                                progress_callback=None, user_context=None, session=None):
         """
         Create a DOCX file with a border around the entire page with optional header and footer.
         
@@ -90,216 +366,102 @@ class MSWord:
             footer (str, optional): Optional footer text
             progress_callback (callable, optional): Callback function to report progress
             user_context (str, optional): User context for logging purposes
+            session (requests.Session, optional): HTTP session used to download the images
         """
-        progress_callback = MSWord._get_callback(progress_callback)
+        from docx import Document
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        from docx.shared import Inches, Pt
+
+        progress_callback = get_progress_callback(progress_callback)
         context_info = f" for {user_context}" if user_context else ""
         
-        # temp/uuid/temp_images
-        image_session_path = f"temp/{uuid}/temp_images"
         docx_session_path = f"temp/{uuid}/{filename}"
-        if not os.path.exists(os.path.dirname(f'temp/{uuid}')):
-            os.makedirs(os.path.dirname(f'temp/{uuid}'))
+        # The images no longer live under temp/uuid, so create it for the document itself
+        os.makedirs(os.path.dirname(docx_session_path), exist_ok=True)
         # Download images if provided
         title = content.get("title")
+        # Download each image once, even if the article shows it several times
         image_urls = []
+        seen_urls = set()
         for block in content["content_blocks"]:
-            if block["type"] == "image":
+            if block["type"] == "image" and block["url"] not in seen_urls:
+                seen_urls.add(block["url"])
                 image_urls.append(block)
 
         # download the images
-        if image_urls:
-            progress_callback("Downloading images...", 65)
-            images = MSWord._temp_download_images(images=image_urls, download_path=image_session_path, 
-                                                progress_callback=progress_callback, user_context=user_context)
-            progress_callback("Images downloaded successfully", 75)
-        else:
-            images = {}
+        # A fresh directory per document, so concurrent documents never see
+        # or delete each other's images
+        image_session_path = tempfile.mkdtemp(prefix="articlevault_images_") if image_urls else None
+        try:
+            if image_urls:
+                progress_callback("Downloading images...", 65)
+                images = MSWord._temp_download_images(images=image_urls, download_path=image_session_path, 
+                                                    progress_callback=progress_callback, user_context=user_context,
+                                                    session=session)
+                progress_callback("Images downloaded successfully", 75)
+            else:
+                images = {}
 
-        # Create a new Document
-        progress_callback("Creating document structure...", 80)
+            # Create a new Document
+            progress_callback("Creating document structure...", 80)
             
-        doc = Document()
+            doc = Document()
         
-        # Set page margins
-        for section in doc.sections:
-            section.top_margin = Inches(1)
-            section.bottom_margin = Inches(1)
-            section.left_margin = Inches(1)
-            section.right_margin = Inches(1)
+            # Set the margins, page border, header and footer of the only section
+            MSWord._apply_section_props(doc.sections[0], Inches(1), border_color, border_width,
+                                        header, footer)
         
-        # Add header if provided
-        if header:
-            header_section = doc.sections[0]
-            header_obj = header_section.header
-            header_para = header_obj.paragraphs[0]
-            header_para.text = header
-            header_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            # Add a title
+            title_paragraph = doc.add_paragraph()
+            title_run = title_paragraph.add_run(title)
+            title_run.bold = True
+            title_run.font.size = Pt(16)
+            title_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+            # date (if available)
+            date = content.get("date", "")
+            if date:
+                date_paragraph = doc.add_paragraph()
+                date_run = date_paragraph.add_run(date)
+                date_run.italic = True
+                date_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                date_paragraph.space_after = Pt(6)
+
+
+            # url
+            url_paragraph = doc.add_paragraph()
+            url_run = url_paragraph.add_run(url)
+            url_run.italic = True
+            url_paragraph.alignment = WD_ALIGN_PARAGRAPH.LEFT
+            url_paragraph.space_after = Pt(12)  # Add space after the URL paragraph
         
-        # Add a title
-        title_paragraph = doc.add_paragraph()
-        title_run = title_paragraph.add_run(title)
-        title_run.bold = True
-        title_run.font.size = Pt(16)
-        title_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-        # date (if available)
-        date = content.get("date", "")
-        if date:
-            date_paragraph = doc.add_paragraph()
-            date_run = date_paragraph.add_run(date)
-            date_run.italic = True
-            date_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            date_paragraph.space_after = Pt(6)
-
-
-        # url
-        url_paragraph = doc.add_paragraph()
-        url_run = url_paragraph.add_run(url)
-        url_run.italic = True
-        url_paragraph.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        url_paragraph.space_after = Pt(12)  # Add space after the URL paragraph
         
+            # Image part of each embedded image, so repeated images share one part
+            image_parts = {}
         
-        # Process content blocks
-        total_blocks = len(content["content_blocks"])
-        for i, block in enumerate(content["content_blocks"]):
-            if i % 5 == 0:  # Update progress every 5 blocks
-                progress_pct = 80 + (i / total_blocks * 10)  # Progress from 80% to 90%
-                progress_callback(f"Creating document content ({i}/{total_blocks})...", progress_pct)
+            # Process content blocks
+            total_blocks = len(content["content_blocks"])
+            # Only format the per-block progress messages if someone receives them
+            report_block_progress = not getattr(progress_callback, "is_noop", False)
+            progress_step = 10 / total_blocks if total_blocks else 0
+            # Update progress every 5 blocks, or less often for long articles so the
+            # UI is updated at most about 20 times
+            progress_stride = max(5, total_blocks // 20)
+            # Each block type is added by its own renderer, other types are skipped
+            block_renderers = {"text": MSWord._render_text_block, "image": MSWord._render_image_block}
+            for i, block in enumerate(content["content_blocks"]):
+                if report_block_progress and i % progress_stride == 0:
+                    progress_pct = 80 + i * progress_step  # Progress from 80% to 90%
+                    progress_callback(f"Creating document content ({i}/{total_blocks})...", progress_pct)
     
-            block_type = block["type"]
-            if block_type == "text":
-                text_content = block["content"]
-                if text_content:
-                    # Create a new paragraph for the text
-                    paragraph = doc.add_paragraph()
-                    
-                    # Check for markdown-style formatting indicators
-                    
-                    # Handle headings (lines starting with ## or #)
-                    if text_content.lstrip().startswith('##'):
-                        run = paragraph.add_run(text_content.lstrip('#').strip())
-                        run.bold = True
-                        run.font.size = Pt(14)
-                        paragraph.style = 'Heading 2'
-                    elif text_content.lstrip().startswith('#'):
-                        run = paragraph.add_run(text_content.lstrip('#').strip())
-                        run.bold = True
-                        run.font.size = Pt(15)
-                        paragraph.style = 'Heading 1'
-                    
-                    # Handle entire paragraph in bold (**text**)
-                    elif text_content.startswith('**') and text_content.endswith('**'):
-                        run = paragraph.add_run(text_content.strip('**'))
-                        run.bold = True
-                    
-                    # Handle entire paragraph in italics (_text_)
-                    elif (text_content.startswith('_') and text_content.endswith('_')) or \
-                         (text_content.startswith('*') and text_content.endswith('*')):
-                        run = paragraph.add_run(text_content.strip('_*'))
-                        run.italic = True
-                    
-                    # Handle mixed formatting with ** for bold and _ or * for italic
-                    else:
-                        # Process text with inline formatting
-                        remaining_text = text_content
-                        
-                        # Iterator for inline formatting
-                        while remaining_text:
-                            # Look for bold text
-                            bold_start = remaining_text.find('**')
-                            if bold_start != -1:
-                                bold_end = remaining_text.find('**', bold_start + 2)
-                                if bold_end != -1:
-                                    # Add text before the bold section
-                                    if bold_start > 0:
-                                        run = paragraph.add_run(remaining_text[:bold_start])
-                                    
-                                    # Add the bold text
-                                    bold_text = remaining_text[bold_start + 2:bold_end]
-                                    run = paragraph.add_run(bold_text)
-                                    run.bold = True
-                                    
-                                    # Continue with remaining text
-                                    remaining_text = remaining_text[bold_end + 2:]
-                                    continue
-                            
-                            # Look for italic text
-                            italic_marker = '_' if '_' in remaining_text else '*'
-                            italic_start = remaining_text.find(italic_marker)
-                            if italic_start != -1:
-                                italic_end = remaining_text.find(italic_marker, italic_start + 1)
-                                if italic_end != -1:
-                                    # Add text before the italic section
-                                    if italic_start > 0:
-                                        run = paragraph.add_run(remaining_text[:italic_start])
-                                    
-                                    # Add the italic text
-                                    italic_text = remaining_text[italic_start + 1:italic_end]
-                                    run = paragraph.add_run(italic_text)
-                                    run.italic = True
-                                    
-                                    # Continue with remaining text
-                                    remaining_text = remaining_text[italic_end + 1:]
-                                    continue
-                            
-                            # No more formatting found, add the rest of the text
-                            if remaining_text:
-                                paragraph.add_run(remaining_text)
-                                break
-
-            elif block_type == "image":
-                url = block["url"]
-                caption = block.get("caption", "")
-                # get image path from the downloaded images
-                image_path = images.get(url, None)
-                
-                p = doc.add_paragraph()
-                p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                
-                if image_path and os.path.exists(image_path):
-                    try:
-                        run = p.add_run()
-                        run.add_picture(image_path, width=Inches(4)) # the image width is hardcoded to 4 inches, todo: make it configurable in streamlit
-                        
-                        # Add caption if available
-                        caption = block.get('caption', '')
-                        if caption:
-                            caption_para = doc.add_paragraph()
-                            caption_run = caption_para.add_run(caption)
-                            caption_run.italic = True
-                            caption_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                    
-                    except Exception as img_error:
-                        # If adding the image fails, add a placeholder
-                        error_msg = f"Error adding image to document{context_info}: {url} - {str(img_error)}"
-                        logger.error(error_msg)
-                        file_logger.error(error_msg)
-                        run = p.add_run("[Image could not be displayed]")
-                        run.italic = True
-                        
-                        # Try to still add caption
-                        if caption:
-                            p.add_run("\n" + caption)
-                else:
-                    # Add a placeholder if image wasn't downloaded successfully
-                    run = p.add_run("[Image unavailable]")
-                    run.italic = True
-
-        if image_urls:
-            # Clean up temporary images after adding them to the document
-            MSWord._temp_delete_images(download_path=image_session_path, user_context=user_context)
-        
-        # Add footer if provided
-        if footer:
-            footer_section = doc.sections[0]
-            footer_obj = footer_section.footer
-            footer_para = footer_obj.paragraphs[0]
-            footer_para.text = footer
-            footer_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        # Add page border to the document
-        MSWord._add_page_border(doc, border_color, border_width)
+                renderer = block_renderers.get(block["type"])
+                if renderer is not None:
+                    renderer(doc, block, images, image_parts, context_info)
+        finally:
+            # Clean up the temporary images once they are embedded in the document,
+            # or if building it failed
+            if image_session_path is not None:
+                MSWord._temp_delete_images(download_path=image_session_path, user_context=user_context)
         
         progress_callback("Saving document...", 95)
             
@@ -311,7 +473,8 @@ class MSWord:
         return f"Document with page border saved as {filename}"
 
 
-    def _temp_delete_images(download_path: str = "temp_images", user_context: str = None):
+    @staticmethod
+    def _temp_delete_images(download_path: str, user_context: str = None):
         """
         Delete temporary images downloaded during the document creation.
         This method should be called after the document is saved to clean up.
@@ -320,13 +483,10 @@ class MSWord:
             download_path (str): Path to the temporary images directory
             user_context (str, optional): User context for logging purposes
         """
-        import os
-        import shutil
-        
         context_info = f" for {user_context}" if user_context else ""
         
         if os.path.exists(download_path):
-            shutil.rmtree(download_path)
+            shutil.rmtree(download_path, ignore_errors=True)
             info_msg = f"Temporary images deleted from {download_path}{context_info}"
             logger.info(info_msg)
             file_logger.info(info_msg)
@@ -336,8 +496,9 @@ class MSWord:
             file_logger.info(info_msg)
    
     @staticmethod
-    def _temp_download_images(images: list[dict], download_path: str = "temp_images", 
-                            progress_callback=None, user_context: str = None) -> dict:
+    def _temp_download_images(images: list[dict], download_path: str, 
+                            progress_callback=None, user_context: str = None, session=None,
+                            max_image_bytes: int = MAX_IMAGE_BYTES) -> dict:
         """
         Download images from the provided URLs and save them to the specified path.
         
@@ -346,20 +507,22 @@ class MSWord:
             download_path (str): Path where to save the downloaded images
             progress_callback (callable, optional): Callback function to report progress
             user_context (str, optional): User context for logging purposes
+            session (requests.Session, optional): HTTP session to reuse connections,
+                the module's shared session is used if not provided
+            max_image_bytes (int, optional): Images larger than this are skipped
         Returns:
             dict: A dictionary mapping image URLs to their local file paths
         """
-        progress_callback = MSWord._get_callback(progress_callback)
+        progress_callback = get_progress_callback(progress_callback)
         context_info = f" for {user_context}" if user_context else ""
+        http = session if session is not None else _default_http_session()
         
         
-        if not os.path.exists(download_path):
-            os.makedirs(download_path)
+        os.makedirs(download_path, exist_ok=True)
         
-        # Add Pillow import for image conversion
+        # Check Pillow is available for image conversion
         try:
-            from PIL import Image
-            import io
+            import PIL  # noqa: F401
             has_pillow = True
         except ImportError:
             warning_msg = f"Pillow library not found{context_info}. Image conversion will be limited."
@@ -370,77 +533,146 @@ class MSWord:
         im_dict = dict()
         total_images = len(images)
         
-        for i, image in enumerate(images):
-            img_url = image["url"]
-            
-            if total_images > 0:
-                progress_pct = 65 + ((i / total_images) * 10)  # Progress from 65% to 75%
+        # Download the images concurrently, the work is bound by network latency.
+        # Results are collected here as they complete, so the progress callback
+        # is only called from the calling thread and a slow first image doesn't
+        # hold back the progress of the others.
+        with ThreadPoolExecutor(max_workers=min(MAX_DOWNLOAD_WORKERS, total_images)) as executor:
+            futures = {
+                executor.submit(MSWord._download_image, image["url"], download_path, http,
+                                has_pillow, context_info, max_image_bytes): image["url"]
+                for image in images
+            }
+            for i, future in enumerate(as_completed(futures)):
+                progress_pct = 65 + (((i + 1) / total_images) * 10)  # Progress from 65% to 75%
                 progress_callback(f"Downloading image {i+1}/{total_images}", progress_pct)
-                
-            try:
-                parsed_url = urlparse(img_url)
-                file_name = os.path.basename(parsed_url.path)
-                response = requests.get(img_url)
-                response.raise_for_status()
-                
-                # Generate a unique filename to avoid collisions
-                base_name = os.path.splitext(file_name)[0]
-                safe_name = f"{base_name}_{hash(img_url) % 10000}"
-                
-                # Path for the original download
-                temp_path = os.path.join(download_path, f"temp_{safe_name}")
-                
-                # Save the original image data first
-                with open(temp_path, 'wb') as img_file:
-                    img_file.write(response.content)
-                
-                if has_pillow:
-                    try:
-                        # Try to open and convert the image with Pillow
-                        img = Image.open(temp_path)
-                        
-                        # Convert to RGB mode (handles RGBA, grayscale, etc.)
-                        if img.mode != 'RGB':
-                            img = img.convert('RGB')
-                        
-                        # Save as PNG (format python-docx handles well)
-                        final_path = os.path.join(download_path, f"{safe_name}.png")
-                        img.save(final_path, "PNG")
-                        
-                        # Clean up the temp file
-                        os.remove(temp_path)
-                        
-                        im_dict[img_url] = final_path
-                        info_msg = f"Image {img_url} converted and saved as {final_path}{context_info}"
-                        logger.info(info_msg)
-                        file_logger.info(info_msg)
-                        
-                    except Exception as img_error:
-                        error_msg = f"Image conversion failed{context_info} for {img_url}: {img_error}"
-                        logger.error(error_msg)
-                        file_logger.error(error_msg)
-                        # If conversion fails, try using the original file
-                        content_type = response.headers.get('Content-Type', '')
-                        extension = mimetypes.guess_extension(content_type) or '.jpg'
-                        final_path = os.path.join(download_path, f"{safe_name}{extension}")
-                        os.rename(temp_path, final_path)
-                        im_dict[img_url] = final_path
-                else:
-                    # Without Pillow, just guess the extension and hope for the best
-                    content_type = response.headers.get('Content-Type', '')
-                    extension = mimetypes.guess_extension(content_type) or '.jpg'
-                    final_path = os.path.join(download_path, f"{safe_name}{extension}")
-                    os.rename(temp_path, final_path)
-                    im_dict[img_url] = final_path
-                    
-            except Exception as e:
-                error_msg = f"Failed to download {img_url}{context_info}: {e}"
-                logger.error(error_msg)
-                file_logger.error(error_msg)
+                final_path = future.result()
+                if final_path:
+                    im_dict[futures[future]] = final_path
 
 
         return im_dict  # Return the dictionary of downloaded images with their paths
 
+    @staticmethod
+    def _download_image(img_url: str, download_path: str, http, has_pillow: bool,
+                        context_info: str = "", max_image_bytes: int = MAX_IMAGE_BYTES) -> Optional[str]:
+        """
+        Download a single image and convert it to a format python-docx handles well.
+        
+        Args:
+            img_url (str): URL of the image to download
+            download_path (str): Path where to save the downloaded image
+            http: requests.Session (or the requests module) used for the request
+            has_pillow (bool): Whether Pillow is available for the conversion
+            context_info (str): User context suffix for log messages
+            max_image_bytes (int): Size above which the image is skipped
+        Returns:
+            str: Local path of the downloaded image, None if the download failed
+                or the image is too large
+        """
+        try:
+            parsed_url = urlparse(img_url)
+            file_name = os.path.basename(parsed_url.path)
+            
+            # Generate a unique filename to avoid collisions, the digest of the URL
+            # is the same in every process, unlike hash()
+            base_name = os.path.splitext(file_name)[0]
+            url_digest = hashlib.blake2b(img_url.encode(), digest_size=6).hexdigest()
+            safe_name = f"{base_name}_{url_digest}"
+            
+            # Stream the image data to disk, so large images aren't held in memory.
+            # The file is named after the Content-Type, so an image kept as it is
+            # is already at its final path.
+            with http.get(img_url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                response.raise_for_status()
+                # Skip huge images before reading their body, when the server tells their size
+                content_length = response.headers.get('Content-Length', '')
+                if content_length.isdigit() and int(content_length) > max_image_bytes:
+                    warning_msg = (f"Skipping image {img_url}{context_info}: "
+                                   f"{content_length} bytes is over the {max_image_bytes} bytes limit")
+                    logger.warning(warning_msg)
+                    file_logger.warning(warning_msg)
+                    return None
+                content_type = response.headers.get('Content-Type', '').split(';')[0].strip()
+                extension = mimetypes.guess_extension(content_type) or '.jpg'
+                download_file = os.path.join(download_path, f"{safe_name}{extension}")
+                # Undo any gzip/deflate transfer encoding while copying
+                response.raw.decode_content = True
+                with open(download_file, 'wb') as img_file:
+                    # Also enforce the limit while copying, the size may be missing or wrong
+                    copied_bytes = 0
+                    while chunk := response.raw.read(DOWNLOAD_CHUNK_SIZE):
+                        copied_bytes += len(chunk)
+                        if copied_bytes > max_image_bytes:
+                            raise ValueError(f"image is over the {max_image_bytes} bytes limit")
+                        img_file.write(chunk)
+            
+            if has_pillow:
+                from PIL import Image
+
+                try:
+                    # Try to open the image with Pillow, this only reads its header
+                    with Image.open(download_file) as img:
+                        oversized = max(img.size) > MAX_IMAGE_SIZE
+                        # Small JPEGs, PNGs and GIFs are embedded by python-docx as they are,
+                        # so they skip the decode and re-encode
+                        passthrough_ext = None
+                        passthrough_format = PASSTHROUGH_IMAGE_FORMATS.get(img.format)
+                        if passthrough_format and img.mode in passthrough_format[1] and not oversized:
+                            passthrough_ext = passthrough_format[0]
+                        else:
+                            if oversized:
+                                # draft() lets JPEGs decode straight at a reduced scale
+                                img.draft('RGB', (MAX_IMAGE_SIZE, MAX_IMAGE_SIZE))
+                            # Keep transparent images as PNG, store the others, mostly
+                            # photos, as JPEG which is far smaller and faster to encode
+                            has_alpha = img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+                            # Free the decoded pixels as soon as they are saved, not when
+                            # the worker thread gets to its next image
+                            with img.convert('RGBA' if has_alpha else 'RGB') as converted:
+                                if oversized:
+                                    # The image is shown 4 inches wide, so store no more pixels
+                                    # than that needs
+                                    converted.thumbnail((MAX_IMAGE_SIZE, MAX_IMAGE_SIZE), Image.Resampling.LANCZOS)
+                                if has_alpha:
+                                    final_path = os.path.join(download_path, f"{safe_name}_converted.png")
+                                    converted.save(final_path, "PNG", optimize=False)
+                                else:
+                                    final_path = os.path.join(download_path, f"{safe_name}_converted.jpg")
+                                    converted.save(final_path, "JPEG", quality=85)
+
+                    if passthrough_ext is None:
+                        # Clean up the original download
+                        os.remove(download_file)
+                    elif extension == passthrough_ext:
+                        final_path = download_file
+                    else:
+                        # The Content-Type was wrong, use the extension of the actual format
+                        final_path = os.path.join(download_path, f"{safe_name}{passthrough_ext}")
+                        os.replace(download_file, final_path)
+                    
+                    info_msg = f"Image {img_url} converted and saved as {final_path}{context_info}"
+                    logger.info(info_msg)
+                    file_logger.info(info_msg)
+                    return final_path
+                    
+                except Exception as img_error:
+                    error_msg = f"Image conversion failed{context_info} for {img_url}: {img_error}"
+                    logger.error(error_msg)
+                    file_logger.error(error_msg)
+                    # If conversion fails, try using the original file
+                    return download_file
+            else:
+                # Without Pillow, rely on the extension guessed from the Content-Type
+                return download_file
+                
+        except Exception as e:
+            error_msg = f"Failed to download {img_url}{context_info}: {e}"
+            logger.error(error_msg)
+            file_logger.error(error_msg)
+            return None
+
+
 
 
 